@@ -0,0 +1,34 @@
+import numba
+import numpy as np
+
+
+@numba.njit(parallel=True, cache=True, fastmath=True)
+def pr_iter(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    inv_deg: np.ndarray,
+    x: np.ndarray,
+    alpha: float,
+    coeff: float,
+) -> np.ndarray:
+    """Run one PageRank iteration over the CSR matrix of incoming edges.
+
+    Args:
+        indptr: CSR row pointers, one row per destination vertex.
+        indices: Positions of the source vertices of incoming edges.
+        inv_deg: Inverted out-degree of each vertex.
+        x: Current scores.
+        alpha: Damping factor.
+        coeff: Teleport term, (1 - alpha) / N.
+
+    Returns:
+        New scores.
+    """
+    n = indptr.shape[0] - 1
+    out = np.empty(n, dtype=np.float64)
+    for i in numba.prange(n):
+        acc = 0.0
+        for j in range(indptr[i], indptr[i + 1]):
+            acc += x[indices[j]] * inv_deg[indices[j]]
+        out[i] = alpha * acc + coeff
+    return out
@@ -1,3 +1,6 @@
+from collections.abc import Callable
+from typing import Literal
+
 import ibis
 
 from ibisgraph.graph import IbisGraph
@@ -7,6 +10,123 @@ from ibisgraph.pregel import Pregel
 
 PAGERANK_NODE_COL_NAME = "node_id"
 PAGERANK_SCORE_COL_NAME = "pagerank"
+PAGERANK_DELTA_COL_NAME = "delta"
+PAGERANK_PHASE_COL_NAME = "phase"
+LOCAL_BACKENDS = ("duckdb",)
+# All edges are fetched into memory by the in-process path, so it is also bounded by edges.
+LOCAL_MAX_EDGES = 10_000_000
+PAGERANK_CONVERGENCE_MODES = ("per_vertex", "l1")
+
+
+def _local_page_rank(
+    graph: IbisGraph,
+    alpha: float,
+    max_iters: int,
+    tol: float,
+    convergence: Literal["per_vertex", "l1"],
+) -> ibis.Table | None:
+    """Compute PageRank in-process over the CSR matrix of incoming edges.
+
+    The iteration is a Numba kernel if Numba is installed, otherwise SciPy sparse
+    matrix-vector products are used. Semantics are the same as for the Pregel implementation:
+    the iteration stops when every score changes by less than `tol` or, in the "l1" mode,
+    when the sum of changes is less than `num_nodes * tol`.
+
+    Returns:
+        A table with the same schema as `page_rank` or None if neither Numba nor SciPy
+        is installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    num_nodes = graph.num_nodes
+    node_ids = np.unique(graph.nodes[IbisGraphConstants.ID.value].to_pyarrow().to_numpy())
+    edges = graph.edges.select(IbisGraphConstants.SRC.value, IbisGraphConstants.DST.value)
+    edges = edges.to_pyarrow()
+    src = edges.column(IbisGraphConstants.SRC.value).to_numpy()
+    dst = edges.column(IbisGraphConstants.DST.value).to_numpy()
+    if not graph.is_directed:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+
+    src_pos = np.minimum(np.searchsorted(node_ids, src), len(node_ids) - 1)
+    dst_pos = np.minimum(np.searchsorted(node_ids, dst), len(node_ids) - 1)
+    src_known = node_ids[src_pos] == src
+    out_deg = np.bincount(src_pos[src_known], minlength=len(node_ids))
+    valid = src_known & (node_ids[dst_pos] == dst)
+
+    size = len(node_ids)
+    rows = dst_pos[valid]
+    cols = src_pos[valid]
+    indices = cols[np.argsort(rows, kind="stable")]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=size))])
+    inv_deg = np.zeros(size)
+    np.divide(1.0, out_deg, out=inv_deg, where=out_deg > 0)
+    coeff = (1 - alpha) / num_nodes
+
+    try:
+        from ibisgraph.centrality._pagerank_numba import pr_iter
+
+        def step(x):
+            return pr_iter(indptr, indices, inv_deg, x, alpha, coeff)
+
+    except ImportError:
+        try:
+            from scipy import sparse
+        except ImportError:
+            return None
+
+        transitions = sparse.csr_matrix((inv_deg[indices], indices, indptr), shape=(size, size))
+
+        def step(x):
+            return alpha * (transitions @ x) + coeff
+
+    scores = np.full(size, 1.0 / num_nodes)
+    for _ in range(max_iters):
+        new_scores = step(scores)
+        change = np.abs(new_scores - scores)
+        if convergence == "l1":
+            converged = change.sum() < num_nodes * tol
+        else:
+            converged = change.max() < tol
+        scores = new_scores
+        if converged:
+            break
+
+    return ibis.memtable({PAGERANK_NODE_COL_NAME: node_ids, PAGERANK_SCORE_COL_NAME: scores})
+
+
+def _l1_convergence_hook(
+    l1_tol: float, iters_per_check: int
+) -> Callable[[ibis.Table, ibis.Table], bool]:
+    """Create a Pregel hook that stops when the L1 norm of score changes is below `l1_tol`.
+
+    Changes are summed over `iters_per_check` iterations: with Gauss-Seidel half-sweeps each
+    vertex is updated once per two iterations.
+    """
+    checked_iters = 0
+    total_change = 0.0
+
+    def hook(prev_nodes: ibis.Table, nodes: ibis.Table) -> bool:
+        nonlocal checked_iters, total_change
+        joined = nodes.select(IbisGraphConstants.ID.value, PAGERANK_SCORE_COL_NAME).join(
+            prev_nodes.select(
+                IbisGraphConstants.ID.value, ibis._[PAGERANK_SCORE_COL_NAME].name("prev")
+            ),
+            [IbisGraphConstants.ID.value],
+        )
+        change = (joined[PAGERANK_SCORE_COL_NAME] - joined["prev"]).abs().sum().execute()
+        total_change += float(change or 0.0)
+        checked_iters += 1
+        if checked_iters < iters_per_check:
+            return False
+        converged = total_change < l1_tol
+        checked_iters = 0
+        total_change = 0.0
+        return converged
+
+    return hook
 
 
 def page_rank(
@@ -15,6 +135,10 @@ def page_rank(
     max_iters: int = 20,
     checkpoint_interval: int = 1,
     tol: float = 1e-4,
+    delta_threshold: float | None = None,
+    local_threshold: int = 100_000,
+    gauss_seidel: bool = False,
+    convergence: Literal["per_vertex", "l1"] = "l1",
 ) -> ibis.Table:
     """Compute PageRank for a graph using the Pregel iterative algorithm.
 
@@ -32,23 +156,69 @@ def page_rank(
             For distributed engines like Apache Spark, larger values are recommended.
         tol: Convergence tolerance. Stops when score changes are below this value.
             Defaults to 1e-4.
+        delta_threshold: If provided, run the delta-PageRank: vertices propagate only the
+            change of their rank and stop sending messages once the absolute change is below
+            this value. Defaults to None (classic PageRank).
+        local_threshold: Graphs on an in-process backend (DuckDB) with fewer nodes than this
+            value and fewer than `LOCAL_MAX_EDGES` edges are computed in-process with Numba
+            or SciPy instead of Pregel if one of them is installed. The in-process path runs
+            only the classic Jacobi iteration, so it is never used with `delta_threshold` or
+            `gauss_seidel`; `checkpoint_interval` is used only by Pregel. Set to 0 to always
+            use Pregel. Defaults to 100_000.
+        gauss_seidel: If True, vertices are split into two groups by the parity of the ID and
+            each iteration is two half-sweeps: the first group is updated from the current
+            scores, then the second one from the already updated scores of the first group.
+            It converges to the same scores in fewer iterations and each half-sweep aggregates
+            only the messages of one group. If all the IDs have the same parity, one group is
+            empty and every second half-sweep does nothing, so it is only useful for IDs of
+            both parities. Not supported with `delta_threshold`. Defaults to False.
+        convergence: How `tol` is applied. "l1" stops when the sum of absolute score changes
+            is below `num_nodes * tol`, as in NetworkX, and needs one aggregation per
+            iteration. "per_vertex" stops when every score changes by less than `tol` and
+            keeps an error column and an active flag per vertex. Not used in the delta mode.
+            Defaults to "l1".
 
     Returns:
         A table with node IDs (column "node_id") and their corresponding PageRank scores
         (column "pagerank").
 
     Raises:
-        ValueError: If alpha is not between 0 and 1.
+        ValueError: If alpha is not between 0 and 1, if delta_threshold is negative,
+            if both delta_threshold and gauss_seidel are set or if convergence is unknown.
 
     Note:
         - For convergence-based stopping: Set max_iter high and control flow with tol.
         - For fixed iterations: Set tol to 0 and control flow with max_iter.
         - While this implementation supports undirected graphs, PageRank is not
           clearly defined for such graphs.
+        - Vertices without outgoing edges are part of the result, but their scores
+          are not redistributed across the graph.
+        - In the delta mode `tol` is not used: the flow is controlled by `delta_threshold`
+          and `max_iters`. Most of the vertices converge in a few iterations, so late
+          iterations generate messages only from the small set of still changing vertices.
     """
     if (alpha <= 0) or (alpha >= 1.0):
         raise ValueError(f"Expected 0 <= alpha < 1.0 but got {alpha}.")
+    if (delta_threshold is not None) and (delta_threshold < 0):
+        raise ValueError(f"Expected non-negative delta_threshold but got {delta_threshold}.")
+    if (delta_threshold is not None) and gauss_seidel:
+        raise ValueError("Gauss-Seidel iterations are not supported for the delta-PageRank.")
+    if convergence not in PAGERANK_CONVERGENCE_MODES:
+        raise ValueError(
+            f"Expected one of {PAGERANK_CONVERGENCE_MODES} convergence but got {convergence}."
+        )
     num_nodes = graph.num_nodes
+    if (
+        (delta_threshold is None)
+        and not gauss_seidel
+        and (num_nodes < local_threshold)
+        and (ibis.get_backend(graph.nodes).name in LOCAL_BACKENDS)
+        and (graph.num_edges < LOCAL_MAX_EDGES)
+    ):
+        local_result = _local_page_rank(graph, alpha, max_iters, tol, convergence)
+        if local_result is not None:
+            return local_result
+
     coeff = (1 - alpha) / num_nodes
     initial_scores = 1.0 / num_nodes
     if graph.is_directed:
@@ -57,7 +227,12 @@ def page_rank(
         )
     else:
         tmp_degrees = degrees(graph).rename({IbisGraphConstants.ID.value: "node_id"})
-    nodes_with_degrees = graph.nodes.join(tmp_degrees, [IbisGraphConstants.ID.value])
+    # Vertices without outgoing edges never send messages, so degree 0 is safe here.
+    nodes_with_degrees = (
+        graph.nodes.left_join(tmp_degrees, [IbisGraphConstants.ID.value])
+        .drop(f"{IbisGraphConstants.ID.value}_right")
+        .mutate(degree=ibis._["degree"].fill_null(0))
+    )
     new_g = IbisGraph(
         nodes_with_degrees,
         graph.edges,
@@ -67,36 +242,89 @@ def page_rank(
     )
     pregel = Pregel(new_g)
 
-    rank_upd_expr = ibis.ifelse(
-        pregel.pregel_msg().isnull(), ibis.literal(0.0), pregel.pregel_msg()
-    ) * ibis.literal(alpha) + ibis.literal(coeff)
+    if delta_threshold is None:
+        rank_upd_expr = ibis.ifelse(
+            pregel.pregel_msg().isnull(), ibis.literal(0.0), pregel.pregel_msg()
+        ) * ibis.literal(alpha) + ibis.literal(coeff)
 
-    pregel = (
-        pregel.add_vertex_col(
+        per_vertex = convergence == "per_vertex"
+        err_upd_expr = (ibis._[PAGERANK_SCORE_COL_NAME] - rank_upd_expr).abs()
+
+        if gauss_seidel:
+            # The phase is the same for all the vertices and tells which group is updated;
+            # vertices of the other group keep their scores during the half-sweep.
+            in_phase = (ibis._[IbisGraphConstants.ID.value] & 1) == ibis._[PAGERANK_PHASE_COL_NAME]
+            rank_upd_expr = ibis.ifelse(in_phase, rank_upd_expr, ibis._[PAGERANK_SCORE_COL_NAME])
+            err_upd_expr = ibis.ifelse(in_phase, err_upd_expr, ibis._["err"])
+            pregel = pregel.add_vertex_col(
+                PAGERANK_PHASE_COL_NAME,
+                ibis.literal(0),
+                1 - ibis._[PAGERANK_PHASE_COL_NAME],
+            )
+
+        pregel = pregel.add_vertex_col(
             PAGERANK_SCORE_COL_NAME,
             ibis.literal(initial_scores),
             rank_upd_expr,
         )
-        .add_vertex_col(
-            "err",
-            ibis.literal(100.0),
-            (ibis._[PAGERANK_SCORE_COL_NAME] - rank_upd_expr).abs(),
+        if per_vertex:
+            pregel = pregel.add_vertex_col(
+                "err",
+                ibis.literal(100.0),
+                err_upd_expr,
+            ).set_active_flag_upd_col(ibis._["err"] >= tol)
+        else:
+            pregel = pregel.set_post_iter_hook(
+                _l1_convergence_hook(num_nodes * tol, 2 if gauss_seidel else 1)
+            )
+        msg_col_name = PAGERANK_SCORE_COL_NAME
+    else:
+        # Accumulator style: r_0 = delta_0 = (1 - alpha) / N, delta_{t+1} = alpha * sum(msgs)
+        # and r_{t+1} = r_t + delta_{t+1} that converges to the same fixed point.
+        delta_upd_expr = ibis.ifelse(
+            pregel.pregel_msg().isnull(), ibis.literal(0.0), pregel.pregel_msg()
+        ) * ibis.literal(alpha)
+
+        pregel = (
+            pregel.add_vertex_col(
+                PAGERANK_SCORE_COL_NAME,
+                ibis.literal(coeff),
+                ibis._[PAGERANK_SCORE_COL_NAME] + delta_upd_expr,
+            )
+            .add_vertex_col(
+                PAGERANK_DELTA_COL_NAME,
+                ibis.literal(coeff),
+                delta_upd_expr,
+            )
+            .set_active_flag_upd_col(delta_upd_expr.abs() >= delta_threshold)
+            .set_filter_messages_from_non_active(True)
         )
-        .add_message_to_dst(
-            pregel.pregel_src(PAGERANK_SCORE_COL_NAME) / pregel.pregel_src("degree")
+        per_vertex = True
+        msg_col_name = PAGERANK_DELTA_COL_NAME
+
+    def message_to(target: Callable[[str], ibis.Value], source: Callable[[str], ibis.Value]):
+        msg = source(msg_col_name) / source("degree")
+        if not gauss_seidel:
+            return msg
+        target_in_phase = (target(IbisGraphConstants.ID.value) & 1) == target(
+            PAGERANK_PHASE_COL_NAME
         )
-        .set_agg_expression_func(lambda msg: msg.collect().sums())
-        .set_has_active_flag(True)
-        .set_active_flag_upd_col(ibis._["err"] >= tol)
-        .set_early_stopping(True)
-        .set_max_iter(max_iters)
-        .set_stop_if_all_unactive(True)
+        return ibis.ifelse(target_in_phase, msg, ibis.null("float64"))
+
+    pregel = (
+        pregel.add_message_to_dst(message_to(pregel.pregel_dst, pregel.pregel_src))
+        .set_agg_reducer("sum")
+        .set_has_active_flag(per_vertex)
+        # A half-sweep without messages does not mean convergence: the vertices of the group
+        # may have no incoming edges while the other group is not updated yet.
+        .set_early_stopping(per_vertex and not gauss_seidel)
+        .set_max_iter(2 * max_iters if gauss_seidel else max_iters)
+        .set_checkpoint_interval(checkpoint_interval)
+        .set_stop_if_all_unactive(per_vertex)
     )
 
     if not graph.is_directed:
-        pregel = pregel.add_message_to_src(
-            pregel.pregel_dst(PAGERANK_SCORE_COL_NAME) / pregel.pregel_dst("degree")
-        )
+        pregel = pregel.add_message_to_src(message_to(pregel.pregel_src, pregel.pregel_dst))
 
     output = pregel.run()
     return output.rename({PAGERANK_NODE_COL_NAME: IbisGraphConstants.ID.value}).select(
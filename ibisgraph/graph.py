@@ -3,6 +3,9 @@ from enum import Enum
 import ibis
 from typing_extensions import Self
 
+INT32_MIN = -(2**31)
+INT32_MAX = 2**31 - 1
+
 
 class IbisGraphConstants(Enum):
     """Constants for standardizing column names and identifiers in graph data structures.
@@ -43,6 +46,7 @@ class IbisGraph:
         src_col: str = "src",
         dst_col: str = "dst",
         weight_col: str | None = None,
+        narrow_ids: bool = False,
     ) -> None:
         """Initialize an IbisGraph with nodes and edges.
 
@@ -54,6 +58,9 @@ class IbisGraph:
             src_col: Column name for source node in edges. Defaults to "src".
             dst_col: Column name for destination node in edges. Defaults to "dst".
             weight_col: Column name for edge weights. Defaults to None.
+            narrow_ids: Whether to cast node and edge identifiers to int32 if all of them fit
+                into it. Narrow identifiers halve the size of join keys in all the algorithms,
+                but the check runs a query on both tables. Defaults to False.
 
         Raises:
             ValueError: If input columns are missing or have incorrect data types.
@@ -96,6 +103,61 @@ class IbisGraph:
         else:
             self._is_weighted = False
         self._directed = directed
+        self._num_nodes: int | None = None
+        self._num_edges: int | None = None
+        self._pregel_edges: ibis.Table | None = None
+
+        if narrow_ids:
+            self._narrow_ids()
+
+    def _narrow_ids(self) -> None:
+        """Cast identifiers to int32 if the values of all of them fit into it."""
+        id_cols = {
+            IbisGraphConstants.ID.value: self._nodes,
+            IbisGraphConstants.SRC.value: self._edges,
+            IbisGraphConstants.DST.value: self._edges,
+        }
+        if all(table.schema()[col].nbytes <= 4 for col, table in id_cols.items()):
+            return
+
+        bounds = (
+            ibis.union(
+                *(
+                    table.aggregate(
+                        min_id=ibis._[col].min().cast("int64"),
+                        max_id=ibis._[col].max().cast("int64"),
+                    )
+                    for col, table in id_cols.items()
+                )
+            )
+            .to_pyarrow()
+            .to_pylist()
+        )
+        if any(
+            (row["min_id"] is not None) and (row["min_id"] < INT32_MIN or row["max_id"] > INT32_MAX)
+            for row in bounds
+        ):
+            return
+
+        self._nodes = self._nodes.mutate(
+            **{IbisGraphConstants.ID.value: ibis._[IbisGraphConstants.ID.value].cast("int32")}
+        )
+        self._edges = self._edges.mutate(
+            **{
+                col: ibis._[col].cast("int32")
+                for col in (IbisGraphConstants.SRC.value, IbisGraphConstants.DST.value)
+            }
+        )
+
+    def _prepare_for_pregel(self) -> ibis.Table:
+        """Get the edges materialized once for all the Pregel runs over the graph.
+
+        Returns:
+            The cached table of edges.
+        """
+        if self._pregel_edges is None:
+            self._pregel_edges = self._edges.cache()
+        return self._pregel_edges
 
     def set_directed(self, value: bool) -> Self:
         """Set the directionality of the graph.
@@ -134,7 +196,9 @@ class IbisGraph:
         Returns:
             The total number of nodes in the graph.
         """
-        return int(self._nodes.count().to_pandas())
+        if self._num_nodes is None:
+            self._num_nodes = int(self._nodes.count().execute())
+        return self._num_nodes
 
     @property
     def num_edges(self) -> int:
@@ -143,7 +207,9 @@ class IbisGraph:
         Returns:
             The total number of edges in the graph.
         """
-        return int(self._edges.count().to_pandas())
+        if self._num_edges is None:
+            self._num_edges = int(self._edges.count().execute())
+        return self._num_edges
 
     @property
     def is_directed(self) -> bool:
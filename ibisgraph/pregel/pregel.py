@@ -1,11 +1,55 @@
+import functools
+
 import ibis
+import ibis.expr.datatypes as dt
+from ibis.backends import BaseBackend
 from loguru import logger
-from typing_extensions import Callable, Self
+from typing_extensions import Callable, Literal, Self
 
 from ibisgraph.graph import IbisGraph, IbisGraphConstants
 
 from .models import PregelConstants, PregelMessage, PregelVertexColumn
 
+AggReducer = Literal["sum", "max", "min", "first"]
+AGG_REDUCERS: tuple[AggReducer, ...] = ("sum", "max", "min", "first")
+
+
+def _triplet_col_name(side: IbisGraphConstants, col_name: str) -> str:
+    """Name of the flat triplet column holding the attribute of the source or destination."""
+    return f"{side.value}{col_name}"
+
+
+def _materialize(con: BaseBackend, table: ibis.Table, name: str) -> ibis.Table:
+    """Materialize the table; DuckDB gets a named temp table, other backends use cache."""
+    if con.name == "duckdb":
+        return con.create_table(name, obj=table, temp=True, overwrite=True)
+    return table.cache()
+
+
+def _release(con: BaseBackend, name: str) -> None:
+    """Drop the table materialized by `_materialize` if the backend keeps it by name."""
+    if con.name == "duckdb":
+        con.drop_table(name, force=True)
+
+
+def _union_all(tables: list[ibis.Table]) -> ibis.Table:
+    """UNION ALL the tables, casting columns to their common types first.
+
+    Set operations require equal schemas, but messages to sources and to destinations
+    may have different types, e.g. an int8 literal and an int64 attribute.
+    """
+    schemas = [table.schema() for table in tables]
+    common = ibis.schema(
+        {col: dt.highest_precedence([schema[col] for schema in schemas]) for col in schemas[0]}
+    )
+    return functools.reduce(
+        lambda left, right: left.union(right, distinct=False),
+        (
+            table if schema == common else table.cast(common)
+            for table, schema in zip(tables, schemas)
+        ),
+    )
+
 
 class Pregel:
     """A Pregel-style graph processing implementation using Ibis.
@@ -35,17 +79,26 @@ class Pregel:
             graph: An IbisGraph instance representing the graph to be processed.
         """
         self._graph = graph
+        self._con = ibis.get_backend(graph._nodes)
         self._has_active_flag = False
         self._initial_active_flag: ibis.Value | ibis.Deferred = ibis.literal(True)
         self._vertex_cols: dict[str, PregelVertexColumn] = {}
         self._messages: list[PregelMessage] = []
         self._agg_expression_func: Callable[[ibis.Value], ibis.Value] | None = None
+        self._agg_reducer: AggReducer | None = None
         self._do_early_stopping = True
         self._max_iter = 10
         self._checkpoint_interval = 1
         self._active_flag_upd_expr: ibis.Value | ibis.Deferred | None = None
         self._filter_messages_from_non_active: bool = False
         self._stop_if_all_non_active: bool = False
+        self._post_iter_hook: Callable[[ibis.Table, ibis.Table], bool] | None = None
+        # Helpers are pure functions of the attribute name, so their deferred references are
+        # memoized per instance; the keys are also the attributes referenced by messages.
+        self._referenced_src_cols: dict[str, ibis.Deferred] = {}
+        self._referenced_dst_cols: dict[str, ibis.Deferred] = {}
+        self._referenced_edge_cols: dict[str, ibis.Deferred] = {}
+        self._msg_ref: ibis.Deferred = ibis._[PregelConstants.MSG_COL_NAME.value]
 
     def pregel_src(self, col_name: str) -> ibis.Value:
         """Helper method to access attributes of the source column in messages generation.
@@ -56,7 +109,11 @@ class Pregel:
         Returns:
             Ibis wrapper around the attribute.
         """
-        return getattr(ibis._, IbisGraphConstants.SRC.value)[col_name]
+        if col_name not in self._referenced_src_cols:
+            self._referenced_src_cols[col_name] = ibis._[
+                _triplet_col_name(IbisGraphConstants.SRC, col_name)
+            ]
+        return self._referenced_src_cols[col_name]
 
     def pregel_dst(self, col_name: str) -> ibis.Value:
         """Helper method to access attributes of the destination column in messages generation.
@@ -67,7 +124,11 @@ class Pregel:
         Returns:
             Ibis wrapper around the attribute.
         """
-        return getattr(ibis._, IbisGraphConstants.DST.value)[col_name]
+        if col_name not in self._referenced_dst_cols:
+            self._referenced_dst_cols[col_name] = ibis._[
+                _triplet_col_name(IbisGraphConstants.DST, col_name)
+            ]
+        return self._referenced_dst_cols[col_name]
 
     def pregel_edge(self, col_name: str) -> ibis.Value:
         """Helper method to access attributes of the edge in messages generation.
@@ -78,7 +139,11 @@ class Pregel:
         Returns:
             Ibis wrapper around the attribute.
         """
-        return getattr(ibis._, IbisGraphConstants.EDGE.value)[col_name]
+        if col_name not in self._referenced_edge_cols:
+            self._referenced_edge_cols[col_name] = ibis._[
+                _triplet_col_name(IbisGraphConstants.EDGE, col_name)
+            ]
+        return self._referenced_edge_cols[col_name]
 
     def pregel_msg(self) -> ibis.Value:
         """Helper method to access the Pregel message.
@@ -86,7 +151,7 @@ class Pregel:
         Returns:
             Ibis wrapper around the message.
         """
-        return getattr(ibis._, PregelConstants.MSG_COL_NAME.value)
+        return self._msg_ref
 
     def add_vertex_col(
         self,
@@ -185,8 +250,34 @@ class Pregel:
 
         Returns:
             Updated instance of the Pregel.
+            Resets the reducer set by "set_agg_reducer".
         """
         self._agg_expression_func = expression
+        self._agg_reducer = None
+        return self
+
+    def set_agg_reducer(self, kind: AggReducer) -> Self:
+        """Set a built-in reduction for processing messages.
+
+        Messages are aggregated with a direct SQL aggregate (SUM, MAX, MIN, FIRST) instead
+        of an arbitrary expression; for example `"sum"` avoids collecting messages into
+        an array with `msg.collect().sums()`.
+
+        Args:
+            kind: One of "sum", "max", "min" or "first".
+
+        Returns:
+            Updated instance of the Pregel.
+            Resets the expression set by "set_agg_expression_func".
+
+        Raises:
+            ValueError: If kind is not supported.
+        """
+        if kind not in AGG_REDUCERS:
+            raise ValueError(f"Expected one of {AGG_REDUCERS} but got {kind}.")
+
+        self._agg_reducer = kind
+        self._agg_expression_func = None
         return self
 
     def set_early_stopping(self, value: bool) -> Self:
@@ -197,6 +288,9 @@ class Pregel:
         message nullity. For algorithms with guaranteed non-null messages (e.g., LabelPropagation),
         it's recommended to use other control methods (vertices voting, max iter, etc.).
 
+        The check is skipped if both "stop_if_all_unactive" and "filter_messages_from_non_active"
+        are set: in that case the all-inactive check already stops the run.
+
         Args:
             value: Whether to enable early stopping.
 
@@ -291,14 +385,31 @@ class Pregel:
         self._stop_if_all_non_active = value
         return self
 
+    def set_post_iter_hook(self, hook: Callable[[ibis.Table, ibis.Table], bool] | None) -> Self:
+        """Set a function that is called after each iteration.
+
+        Args:
+            hook: Function of the vertices table before and after the iteration that
+                returns True if Pregel should stop. None removes the hook.
+
+        Returns:
+            Updated instance of the Pregel.
+
+        Note:
+            The hook is called after the checkpoint, both tables are still available,
+            so a single aggregation over them is enough to check a global convergence.
+        """
+        self._post_iter_hook = hook
+        return self
+
     def _validate(self) -> None:
         """Validate Pregel configuration before running.
 
         Raises:
             ValueError: If required components are missing.
         """
-        if self._agg_expression_func is None:
-            raise ValueError("AggExpression should be provided!")
+        if (self._agg_expression_func is None) and (self._agg_reducer is None):
+            raise ValueError("AggExpression or AggReducer should be provided!")
         if len(self._messages) == 0:
             raise ValueError("At least one message (to src or to dst) should be provided!")
         if len(self._vertex_cols) == 0:
@@ -315,12 +426,9 @@ class Pregel:
             ValueError: If validation fails before running.
         """
         self._validate()
-        messages = [
-            ibis.struct({IbisGraphConstants.ID.value: m.target_column, "msg": m.msg_expr})
-            for m in self._messages
-        ]
 
-        graph_columns = [getattr(ibis._, c) for c in self._graph._nodes.columns]
+        node_col_refs = [ibis._[col] for col in self._graph._nodes.columns]
+        graph_columns = list(node_col_refs)
         for vcol in self._vertex_cols.values():
             graph_columns.append(vcol.initial_expr.name(vcol.col_name))
 
@@ -329,116 +437,172 @@ class Pregel:
                 self._initial_active_flag.name(PregelConstants.ACTIVE_VERTEX_FLAG.value)
             )
 
+        tables_prefix = ibis.util.gen_name("pregel")
+        # Checkpoints alternate between two fixed names: the new state is materialized
+        # into one slot, then the previous state in the other slot is dropped.
+        nodes_slots = (f"{tables_prefix}_nodes_0", f"{tables_prefix}_nodes_1")
+        cache_slot = 0
+
         pregel_nodes_data = self._graph._nodes.select(*graph_columns)
-        edges = self._graph._edges.select(
-            ibis.struct({col: getattr(ibis._, col) for col in self._graph._edges.columns}).name(
-                IbisGraphConstants.EDGE.value
+        # Edges are already materialized for the graph: the projection of the endpoints and
+        # the attributes referenced by messages is a cheap scan of that table.
+        edge_cols = sorted(
+            {IbisGraphConstants.SRC.value, IbisGraphConstants.DST.value}
+            | self._referenced_edge_cols.keys()
+        )
+        edges = self._graph._prepare_for_pregel().select(
+            {_triplet_col_name(IbisGraphConstants.EDGE, col): ibis._[col] for col in edge_cols}
+        )
+
+        # Only the vertex attributes that are referenced by messages are pushed through the
+        # triplets joins; the ID is always needed as a join key.
+        required_cols = {IbisGraphConstants.ID.value}
+        src_cols = sorted(required_cols | self._referenced_src_cols.keys())
+        dst_cols = sorted(required_cols | self._referenced_dst_cols.keys())
+        src_id_col = _triplet_col_name(IbisGraphConstants.SRC, IbisGraphConstants.ID.value)
+        dst_id_col = _triplet_col_name(IbisGraphConstants.DST, IbisGraphConstants.ID.value)
+
+        # All the expressions below are deferred and do not depend on the state of the
+        # iteration, so they are built once and only bound to the new tables in the loop.
+        src_view_cols = {
+            _triplet_col_name(IbisGraphConstants.SRC, col): ibis._[col] for col in src_cols
+        }
+        dst_view_cols = {
+            _triplet_col_name(IbisGraphConstants.DST, col): ibis._[col] for col in dst_cols
+        }
+        active_vertex = ibis._[PregelConstants.ACTIVE_VERTEX_FLAG.value].cast("bool")
+        edge_src_col = _triplet_col_name(IbisGraphConstants.EDGE, IbisGraphConstants.SRC.value)
+        edge_dst_col = _triplet_col_name(IbisGraphConstants.EDGE, IbisGraphConstants.DST.value)
+        message_projections = [
+            (
+                m.target_column.name(IbisGraphConstants.ID.value),
+                m.msg_expr.name(PregelConstants.MSG_COL_NAME.value),
             )
-        ).cache()
+            for m in self._messages
+        ]
+        not_null_message = self._msg_ref.notnull()
+
+        update_columns = list(node_col_refs)
+        for vertex_col in self._vertex_cols.values():
+            update_columns.append(vertex_col.update_expr.name(vertex_col.col_name))
+        if self._has_active_flag:
+            if self._active_flag_upd_expr is not None:
+                update_columns.append(
+                    self._active_flag_upd_expr.name(PregelConstants.ACTIVE_VERTEX_FLAG.value)
+                )
+            else:
+                update_columns.append(
+                    not_null_message.name(PregelConstants.ACTIVE_VERTEX_FLAG.value)
+                )
+
+        # With messages filtered by activity, no active vertices means no messages, so the
+        # all-inactive check is used for stopping and the messages count is skipped.
+        skip_msg_count = self._stop_if_all_non_active and self._filter_messages_from_non_active
+        # The default active flag is "received a message": if some messages were counted in
+        # the iteration, some vertices are active and the all-inactive query is not needed.
+        activity_from_messages = self._active_flag_upd_expr is None
+
+        # The configuration was checked by "_validate", the aggregation is resolved once.
+        agg_reducer = self._agg_reducer
+        if agg_reducer is not None:
+
+            def agg_fn(msg_col: ibis.Value) -> ibis.Value:
+                return getattr(msg_col, agg_reducer)()
 
+        else:
+            agg_fn = self._agg_expression_func
+
+        max_iter = self._max_iter
         it = 0
 
-        while it < self._max_iter:
-            logger.info(f"Start iteration {it} of {self._max_iter}")
+        while it < max_iter:
+            logger.info(f"Start iteration {it} of {max_iter}")
             it += 1
 
-            src_nodes_data = pregel_nodes_data.select(
-                ibis.struct({col: ibis._[col] for col in pregel_nodes_data.columns}).name(
-                    IbisGraphConstants.SRC.value
-                )
-            )
-            dst_nodes_data = pregel_nodes_data.select(
-                ibis.struct({col: ibis._[col] for col in pregel_nodes_data.columns}).name(
-                    IbisGraphConstants.DST.value
+            if self._filter_messages_from_non_active:
+                # Frontier: only edges with at least one active end are joined with vertices.
+                active_ids = pregel_nodes_data.filter(active_vertex)[IbisGraphConstants.ID.value]
+                iteration_edges = edges.filter(
+                    ibis.or_(
+                        edges[edge_src_col].isin(active_ids), edges[edge_dst_col].isin(active_ids)
+                    )
                 )
-            )
+            else:
+                iteration_edges = edges
+
+            src_nodes_data = pregel_nodes_data.select(src_view_cols)
+            dst_nodes_data = pregel_nodes_data.select(dst_view_cols)
             triplets = src_nodes_data.inner_join(
-                edges,
-                [
-                    src_nodes_data[IbisGraphConstants.SRC.value][IbisGraphConstants.ID.value]
-                    == edges[IbisGraphConstants.EDGE.value][IbisGraphConstants.SRC.value]
-                ],
+                iteration_edges,
+                [src_nodes_data[src_id_col] == iteration_edges[edge_src_col]],
             ).inner_join(
                 dst_nodes_data,
-                [
-                    dst_nodes_data[IbisGraphConstants.DST.value][IbisGraphConstants.ID.value]
-                    == edges[IbisGraphConstants.EDGE.value][IbisGraphConstants.DST.value]
-                ],
+                [dst_nodes_data[dst_id_col] == iteration_edges[edge_dst_col]],
             )
-            if self._filter_messages_from_non_active:
-                src_active = triplets[IbisGraphConstants.SRC.value][
-                    PregelConstants.ACTIVE_VERTEX_FLAG.value
-                ].cast("bool")
-                dst_active = triplets[IbisGraphConstants.DST.value][
-                    PregelConstants.ACTIVE_VERTEX_FLAG.value
-                ].cast("bool")
-                triplets = triplets.filter(ibis.or_(src_active, dst_active))
-
-            triplets_with_messages = triplets.select(ibis.array(messages).unnest().name("msg"))
-            new_messages_table = triplets_with_messages.filter(
-                triplets_with_messages["msg"]["msg"].notnull()
-            ).select(
-                triplets_with_messages["msg"][IbisGraphConstants.ID.value],
-                triplets_with_messages["msg"]["msg"].name(PregelConstants.MSG_COL_NAME.value),
+
+            new_messages_table = _union_all(
+                [
+                    triplets.select(*projection).filter(not_null_message)
+                    for projection in message_projections
+                ]
             )
 
-            if self._do_early_stopping:
-                cnt_of_not_null_msgs = new_messages_table.count().to_pandas()
+            has_messages = False
+            if self._do_early_stopping and not skip_msg_count:
+                cnt_of_not_null_msgs = int(self._con.execute(new_messages_table.count()))
                 logger.info(f"{cnt_of_not_null_msgs} non null messages were generated.")
                 if cnt_of_not_null_msgs == 0:
                     logger.info(f"Pregel stopped on the iteration {it}: no more messages.")
                     break
+                has_messages = True
 
-            assert self._agg_expression_func is not None
-            msg_col = new_messages_table[PregelConstants.MSG_COL_NAME.value]
             aggregated_messages = new_messages_table.group_by(IbisGraphConstants.ID.value).agg(
-                {PregelConstants.MSG_COL_NAME.value: self._agg_expression_func(msg_col)}
+                {
+                    PregelConstants.MSG_COL_NAME.value: agg_fn(
+                        new_messages_table[PregelConstants.MSG_COL_NAME.value]
+                    )
+                }
             )
 
             pregel_nodes_data = pregel_nodes_data.join(
                 aggregated_messages, [IbisGraphConstants.ID.value], how="left"
             )
 
-            new_columns = [getattr(pregel_nodes_data, col) for col in self._graph._nodes.columns]
-            for vertex_col in self._vertex_cols.values():
-                new_columns.append(vertex_col.update_expr.name(vertex_col.col_name))
-
-            if self._has_active_flag:
-                if self._active_flag_upd_expr is not None:
-                    new_active_col = self._active_flag_upd_expr.name(
-                        PregelConstants.ACTIVE_VERTEX_FLAG.value
-                    )
-                else:
-                    new_active_col = (
-                        pregel_nodes_data[PregelConstants.MSG_COL_NAME.value]
-                        .notnull()
-                        .name(PregelConstants.ACTIVE_VERTEX_FLAG.value)
-                    )
-                new_columns.append(new_active_col)
-
-            tmp_pregel_nodes_data = pregel_nodes_data.select(*new_columns)
+            tmp_pregel_nodes_data = pregel_nodes_data.select(*update_columns)
 
-            if (
+            prev_pregel_nodes_data = pregel_nodes_data
+            do_checkpoint = (
                 (self._checkpoint_interval > 0)
                 and (it != 0)
                 and (it % self._checkpoint_interval == 0)
-            ):
-                pregel_nodes_data = tmp_pregel_nodes_data.cache()
+            )
+            if do_checkpoint:
+                pregel_nodes_data = _materialize(
+                    self._con, tmp_pregel_nodes_data, nodes_slots[cache_slot & 1]
+                )
+                cache_slot += 1
             else:
                 pregel_nodes_data = tmp_pregel_nodes_data
 
-            if self._stop_if_all_non_active:
-                all_active = (
-                    pregel_nodes_data.select(
-                        pregel_nodes_data[PregelConstants.ACTIVE_VERTEX_FLAG.value]
-                    )
-                    .distinct()
-                    .to_pandas()
+            # The previous state may live in the other slot, so it is dropped after the hook.
+            stop_by_hook = self._post_iter_hook is not None and self._post_iter_hook(
+                prev_pregel_nodes_data, pregel_nodes_data
+            )
+            if do_checkpoint:
+                _release(self._con, nodes_slots[cache_slot & 1])
+            if stop_by_hook:
+                logger.info(f"Pregel stopped on the iteration {it}: stopped by the hook.")
+                break
+
+            if (
+                self._stop_if_all_non_active
+                and not (activity_from_messages and has_messages)
+                and not self._con.execute(
+                    pregel_nodes_data[PregelConstants.ACTIVE_VERTEX_FLAG.value].any()
                 )
-                if len(all_active) == 1:
-                    if not all_active.values[0]:
-                        logger.info("Pregel stopped earlier: all nodes are non-active.")
-                        break
+            ):
+                logger.info("Pregel stopped earlier: all nodes are non-active.")
+                break
 
         logger.info("Pregel stopped: max-iterations reached.")
         if self._has_active_flag:
@@ -2,12 +2,19 @@ import pathlib
 from dataclasses import dataclass
 
 import ibis
+import numpy as np
+import pyarrow as pa
 import pytest
 
 from ibisgraph import IbisGraph
 
 PROJECT_ROOT = pathlib.Path(__file__).parent.parent
 
+# https://en.wikipedia.org/wiki/Zachary%27s_karate_club, int32 "src" and "dst" columns
+KARATE_CLUB_EDGES_PATH = (
+    pathlib.Path(__file__).parent.joinpath("data").joinpath("karate_club_edges.arrow")
+)
+
 
 @dataclass
 class LDBCDataset:
@@ -19,7 +26,8 @@ class LDBCDataset:
 
 @pytest.hookimpl()
 def pytest_sessionstart(session):
-    ibis.connect("duckdb://")
+    # Memtables of the tests and the tables of the fixtures live in the same database.
+    ibis.set_backend(ibis.duckdb.connect())
     ibis.options.interactive = False
 
 
@@ -28,125 +36,73 @@ def pytest_sessionfinish(session):
     ibis.get_backend().disconnect()
 
 
-@pytest.fixture
-def chain_graph():
+@pytest.fixture(scope="session")
+def con():
+    yield ibis.get_backend()
+
+
+@pytest.fixture(scope="session")
+def chain_graph(con):
     n = 5
-    nodes = ibis.memtable({"id": list(range(1, n + 1))})
-    edges = ibis.memtable({"src": list(range(1, n)), "dst": list(range(2, n + 1))})
+    nodes = con.create_table(
+        "chain_graph_nodes", pa.table({"id": np.arange(1, n + 1, dtype=np.int32)}), overwrite=True
+    )
+    edges = con.create_table(
+        "chain_graph_edges",
+        pa.table(
+            {"src": np.arange(1, n, dtype=np.int32), "dst": np.arange(2, n + 1, dtype=np.int32)}
+        ),
+        overwrite=True,
+    )
 
     yield IbisGraph(nodes, edges)
 
 
-@pytest.fixture
-def karate_club():
-    # https://en.wikipedia.org/wiki/Zachary%27s_karate_club
-    original_edges = [
-        [2, 1],
-        [3, 1],
-        [3, 2],
-        [4, 1],
-        [4, 2],
-        [4, 3],
-        [5, 1],
-        [6, 1],
-        [7, 1],
-        [7, 5],
-        [7, 6],
-        [8, 1],
-        [8, 2],
-        [8, 3],
-        [8, 4],
-        [9, 1],
-        [9, 3],
-        [10, 3],
-        [11, 1],
-        [11, 5],
-        [11, 6],
-        [12, 1],
-        [13, 1],
-        [13, 4],
-        [14, 1],
-        [14, 2],
-        [14, 3],
-        [14, 4],
-        [17, 6],
-        [17, 7],
-        [18, 1],
-        [18, 2],
-        [20, 1],
-        [20, 2],
-        [22, 1],
-        [22, 2],
-        [26, 24],
-        [26, 25],
-        [28, 3],
-        [28, 24],
-        [28, 25],
-        [29, 3],
-        [30, 24],
-        [30, 27],
-        [31, 2],
-        [31, 9],
-        [32, 1],
-        [32, 25],
-        [32, 26],
-        [32, 29],
-        [33, 3],
-        [33, 9],
-        [33, 15],
-        [33, 16],
-        [33, 19],
-        [33, 21],
-        [33, 23],
-        [33, 24],
-        [33, 30],
-        [33, 31],
-        [33, 32],
-        [34, 9],
-        [34, 10],
-        [34, 14],
-        [34, 15],
-        [34, 16],
-        [34, 19],
-        [34, 20],
-        [34, 21],
-        [34, 23],
-        [34, 24],
-        [34, 27],
-        [34, 28],
-        [34, 29],
-        [34, 30],
-        [34, 31],
-        [34, 32],
-        [34, 33],
-    ]
-
-    nodes = ibis.memtable({"id": list(range(1, 35))})
-    edges = ibis.memtable(
-        {"src": [ee[0] for ee in original_edges], "dst": [ee[1] for ee in original_edges]}
+@pytest.fixture(scope="session")
+def karate_club(con):
+    # Graphs are immutable, so one instance is shared by all the tests of the session.
+    nodes = con.create_table(
+        "karate_club_nodes", pa.table({"id": np.arange(1, 35, dtype=np.int32)}), overwrite=True
+    )
+    edges = con.create_table(
+        "karate_club_edges",
+        pa.ipc.open_file(KARATE_CLUB_EDGES_PATH).read_all(),
+        overwrite=True,
     )
 
     yield IbisGraph(nodes, edges)
 
 
 @pytest.fixture
-def ldbc_kgs():
+def ldbc_kgs(con):
     ldbc_kgs_root = PROJECT_ROOT.joinpath("resources").joinpath("ldbc").joinpath("kgs")
-    nodes = ibis.read_csv(ldbc_kgs_root.joinpath("kgs.v"), delim=" ", header=False, names=["id"])
-    edges = ibis.read_csv(
-        ldbc_kgs_root.joinpath("kgs.e"), delim=" ", header=False, names=["src", "dst", "weight"]
-    )
+    # Explicit column types: DuckDB does not have to sniff the files. Tables are cached,
+    # otherwise each query of the algorithms parses the CSV files again.
+    nodes = con.read_csv(
+        ldbc_kgs_root.joinpath("kgs.v"), delim=" ", header=False, columns={"id": "INT32"}
+    ).cache()
+    edges = con.read_csv(
+        ldbc_kgs_root.joinpath("kgs.e"),
+        delim=" ",
+        header=False,
+        columns={"src": "INT32", "dst": "INT32", "weight": "FLOAT"},
+    ).cache()
     graph = IbisGraph(nodes, edges, directed=False)
 
-    bfs_results = ibis.read_csv(
-        ldbc_kgs_root.joinpath("kgs-BFS"), delim=" ", header=False, names=["node_id", "distance"]
-    )
-    properties = {}
-    with ldbc_kgs_root.joinpath("kgs.properties").open("r") as file:
-        for line in file:
-            if "=" in line:
-                key, value = line.split("=", 1)
-                properties[key.strip()] = value.strip()
+    # Unreachable vertices have the distance of the max long value.
+    bfs_results = con.read_csv(
+        ldbc_kgs_root.joinpath("kgs-BFS"),
+        delim=" ",
+        header=False,
+        columns={"node_id": "INT32", "distance": "BIGINT"},
+    ).cache()
+    properties_text = ldbc_kgs_root.joinpath("kgs.properties").read_text()
+    properties = {
+        key.strip(): value.strip()
+        for key, value in (
+            line.split("=", 1) for line in properties_text.splitlines() if "=" in line
+        )
+    }
 
     yield LDBCDataset(
         name="kgs",
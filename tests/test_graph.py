@@ -1,4 +1,6 @@
-import pytest
+import ibis
+
+from ibisgraph import IbisGraph, IbisGraphConstants
 
 
 def test_num_nodes(karate_club):
@@ -9,5 +11,13 @@ def test_num_edges(karate_club):
     assert karate_club.num_edges == 78
 
 
-if __name__ == "__main__":
-    pytest.main()
+def test_narrow_ids():
+    nodes = ibis.memtable({"id": [1, 2, 3]})
+    g = IbisGraph(nodes, ibis.memtable({"src": [1, 2], "dst": [2, 3]}), narrow_ids=True)
+    assert g.nodes.schema()[IbisGraphConstants.ID.value].is_int32()
+    assert g.edges.schema()[IbisGraphConstants.SRC.value].is_int32()
+    assert g.edges.schema()[IbisGraphConstants.DST.value].is_int32()
+
+    g = IbisGraph(nodes, ibis.memtable({"src": [1, 2], "dst": [2, 2**40]}), narrow_ids=True)
+    assert g.nodes.schema()[IbisGraphConstants.ID.value].is_int64()
+    assert g.edges.schema()[IbisGraphConstants.DST.value].is_int64()
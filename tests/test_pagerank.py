@@ -1,19 +1,140 @@
+import importlib
+import sys
+
 import ibis
 import pytest
 
 from ibisgraph.centrality.page_rank import page_rank
 from ibisgraph.graph import IbisGraph
 
+from .utils import joined_max_abs_diff
+
+# The package re-exports the function under the same name as the module.
+page_rank_module = importlib.import_module("ibisgraph.centrality.page_rank")
+
+
+@pytest.fixture(scope="session")
+def karate_club_pagerank(karate_club):
+    return page_rank(karate_club).to_pandas()
+
+
+@pytest.mark.parametrize(
+    "check",
+    [
+        lambda pr: (pr["pagerank"] > 0).all(),
+        lambda pr: pr["pagerank"].sum() == pytest.approx(1.0, 1e-4),
+    ],
+    ids=["positive", "sum_to_one"],
+)
+def test_karate_club(karate_club_pagerank, check):
+    assert check(karate_club_pagerank)
+
+
+def test_karate_club_delta(karate_club):
+    pr = page_rank(karate_club, max_iters=100, delta_threshold=1e-6, local_threshold=0)
+    classic = page_rank(karate_club, max_iters=100, tol=1e-6, local_threshold=0)
+    rows, diff = joined_max_abs_diff(pr, classic, "node_id", "pagerank")
+    assert rows == karate_club.num_nodes
+    assert diff < 1e-4
+    assert pr.select(ibis._.pagerank).to_pandas()["pagerank"].sum() == pytest.approx(1.0, 1e-3)
+
+
+def test_karate_club_gauss_seidel(karate_club):
+    pr = page_rank(karate_club, max_iters=50, tol=1e-7, gauss_seidel=True, local_threshold=0)
+    expected = page_rank(karate_club, max_iters=100, tol=1e-8)
+    rows, diff = joined_max_abs_diff(pr, expected, "node_id", "pagerank")
+    assert rows == karate_club.num_nodes
+    assert diff < 1e-5
+
+
+@pytest.mark.parametrize("local_threshold", [0, 100_000])
+def test_karate_club_convergence_modes(karate_club, local_threshold):
+    pr = page_rank(karate_club, max_iters=100, tol=1e-7, local_threshold=local_threshold)
+    expected = page_rank(
+        karate_club,
+        max_iters=100,
+        tol=1e-7,
+        local_threshold=local_threshold,
+        convergence="per_vertex",
+    )
+    rows, diff = joined_max_abs_diff(pr, expected, "node_id", "pagerank")
+    assert rows == karate_club.num_nodes
+    assert diff < 1e-5
+
 
-def test_karate_club(karate_club):
-    pr = page_rank(karate_club)
-    rr = pr.select((ibis._.pagerank > 0).name("is_pr_gr_0")).distinct().to_pandas()
-    assert len(rr) == 1
-    assert rr.values[0]
-    assert pr.select(ibis._.pagerank).to_pandas()["pagerank"].sum() == pytest.approx(1.0, 1e-4)
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"alpha": 1.0},
+        {"delta_threshold": -1.0},
+        {"delta_threshold": 1e-6, "gauss_seidel": True},
+        {"convergence": "l2"},
+    ],
+    ids=["alpha", "negative_delta", "delta_gauss_seidel", "convergence"],
+)
+def test_invalid_arguments(karate_club, kwargs):
+    with pytest.raises(ValueError):
+        page_rank(karate_club, **kwargs)
 
 
-def test_simple_graph():
+@pytest.mark.parametrize("convergence", ["per_vertex", "l1"])
+def test_directed_gauss_seidel(convergence):
+    # The vertex 1 never gets messages, so the half-sweep of its group has no messages.
+    g = IbisGraph(
+        ibis.memtable({"id": [1, 2]}), ibis.memtable({"src": [1], "dst": [2]}), directed=True
+    )
+    pr = page_rank(g, tol=1e-8, gauss_seidel=True, convergence=convergence)
+    rr = pr.order_by("node_id").to_pyarrow().column("pagerank").to_pylist()
+    assert rr == pytest.approx([0.075, 0.13875], 1e-6)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"delta_threshold": 1e-6}, {"gauss_seidel": True}, {}],
+    ids=["delta", "gauss_seidel", "too_many_edges"],
+)
+def test_pregel_only_options(karate_club, monkeypatch, kwargs):
+    def fail(*args, **kwargs):
+        raise AssertionError("The in-process PageRank should not be used.")
+
+    monkeypatch.setattr(page_rank_module, "_local_page_rank", fail)
+    if not kwargs:
+        monkeypatch.setattr(page_rank_module, "LOCAL_MAX_EDGES", karate_club.num_edges)
+    pr = page_rank(karate_club, max_iters=100, tol=1e-7, **kwargs).to_pandas()
+    assert len(pr) == karate_club.num_nodes
+    assert pr["pagerank"].sum() == pytest.approx(1.0, 1e-3)
+
+
+def test_numba_kernel_matches_scipy():
+    np = pytest.importorskip("numpy")
+    sparse = pytest.importorskip("scipy.sparse")
+    pytest.importorskip("numba")
+    from ibisgraph.centrality._pagerank_numba import pr_iter
+
+    # Incoming edges by destination: 0 <- 1, 1 <- 0, 2 <- 0, 2 <- 1; vertex 2 is dangling.
+    indptr = np.array([0, 1, 2, 4])
+    indices = np.array([1, 0, 0, 1])
+    inv_deg = np.array([0.5, 0.5, 0.0])
+    x = np.array([0.2, 0.3, 0.5])
+    alpha, coeff = 0.85, 0.05
+    transitions = sparse.csr_matrix((inv_deg[indices], indices, indptr), shape=(3, 3))
+    expected = alpha * (transitions @ x) + coeff
+    np.testing.assert_allclose(pr_iter(indptr, indices, inv_deg, x, alpha, coeff), expected)
+
+
+def test_local_scipy_fallback(karate_club, monkeypatch):
+    pytest.importorskip("scipy")
+    # None in sys.modules makes the import of the Numba kernel raise ImportError.
+    monkeypatch.setitem(sys.modules, "ibisgraph.centrality._pagerank_numba", None)
+    pr = page_rank(karate_club, max_iters=100, tol=1e-8)
+    expected = page_rank(karate_club, max_iters=100, tol=1e-8, local_threshold=0)
+    rows, diff = joined_max_abs_diff(pr, expected, "node_id", "pagerank")
+    assert rows == karate_club.num_nodes
+    assert diff < 1e-5
+
+
+@pytest.mark.parametrize("local_threshold", [0, 100_000])
+def test_simple_graph(local_threshold):
     nodes = ibis.memtable(
         {
             "id": [
@@ -40,11 +161,7 @@ def test_simple_graph():
         }
     )
     g = IbisGraph(nodes, edges, directed=True)
-    pr = page_rank(g, max_iters=5)
-    rr = pr.order_by("node_id").select(ibis._.pagerank).to_pandas().values.reshape(-1).tolist()
+    pr = page_rank(g, max_iters=5, local_threshold=local_threshold)
+    rr = pr.order_by("node_id").to_pyarrow().column("pagerank").to_pylist()
     assert sum(rr) == pytest.approx(1.0, 1e-4)
     assert all(abs(real - exp) < 0.005 for real, exp in zip(rr, [0.245, 0.224, 0.303, 0.03, 0.197]))
-
-
-if __name__ == "__main__":
-    pytest.main()
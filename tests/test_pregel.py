@@ -7,37 +7,62 @@ from ibisgraph.pregel import Pregel
 from .utils import assert_ibis_all
 
 
-def test_chain(chain_graph) -> None:
+@pytest.mark.parametrize(
+    "set_aggregation",
+    [
+        lambda pregel: pregel.set_agg_expression_func(lambda msg: msg.collect().maxs()),
+        lambda pregel: pregel.set_agg_reducer("max"),
+    ],
+    ids=["expression", "reducer"],
+)
+def test_chain(chain_graph, set_aggregation) -> None:
     g = chain_graph
 
     pregel = Pregel(g)
+    pregel = pregel.add_vertex_col(
+        "value",
+        ibis.ifelse(
+            ibis._[IbisGraphConstants.ID.value] == ibis.literal(1),
+            ibis.literal(1),
+            ibis.literal(0),
+        ),
+        ibis.ifelse(
+            pregel.pregel_msg() > ibis._.value,
+            pregel.pregel_msg(),
+            ibis._.value,
+        ),
+    ).add_message_to_dst(
+        ibis.ifelse(
+            pregel.pregel_dst("value") <= pregel.pregel_src("value"),
+            pregel.pregel_src("value"),
+            ibis.null("int"),
+        )
+    )
+    result = set_aggregation(pregel).run()
+
+    assert assert_ibis_all(result, ibis._.value == ibis.literal(1))
+
+
+def test_unknown_agg_reducer(chain_graph) -> None:
+    with pytest.raises(ValueError):
+        Pregel(chain_graph).set_agg_reducer("mode")
+
+
+def test_mixed_message_types(chain_graph) -> None:
+    pregel = Pregel(chain_graph)
     result = (
         pregel.add_vertex_col(
             "value",
-            ibis.ifelse(
-                ibis._[IbisGraphConstants.ID.value] == ibis.literal(1),
-                ibis.literal(1),
-                ibis.literal(0),
-            ),
-            ibis.ifelse(
-                pregel.pregel_msg() > ibis._.value,
-                pregel.pregel_msg(),
-                ibis._.value,
-            ),
-        )
-        .add_message_to_dst(
-            ibis.ifelse(
-                pregel.pregel_dst("value") <= pregel.pregel_src("value"),
-                pregel.pregel_src("value"),
-                ibis.null("int"),
-            )
+            ibis.literal(0).cast("int64"),
+            ibis.coalesce(pregel.pregel_msg(), ibis._.value),
         )
-        .set_agg_expression_func(lambda msg: msg.collect().maxs())
+        # An int8 literal to destinations and an int64 attribute to sources.
+        .add_message_to_dst(ibis.literal(1))
+        .add_message_to_src(pregel.pregel_dst("value") + 1)
+        .set_agg_expression_func(lambda msg: msg.max())
+        .set_max_iter(2)
         .run()
     )
 
-    assert assert_ibis_all(result, ibis._.value == ibis.literal(1))
-
-
-if __name__ == "__main__":
-    pytest.main()
+    values = result.order_by(IbisGraphConstants.ID.value).to_pyarrow().column("value").to_pylist()
+    assert values == [2, 2, 2, 2, 1]
@@ -8,7 +8,3 @@ def test_jaccard(karate_club):
     assert jaccard.loc[
         (jaccard["node_id_left"] == 1) & (jaccard["node_id_right"] == 33), "jaccard_similarity"
     ].values.reshape(-1).tolist()[0] == pytest.approx(0.12, 1e-4)
-
-
-if __name__ == "__main__":
-    pytest.main()
@@ -2,4 +2,18 @@ import ibis
 
 
 def assert_ibis_all(table: ibis.Table, expr: ibis.Value | ibis.Deferred) -> bool:
-    return all(table.select(expr.name("cond")).to_pandas().values.reshape(-1).tolist())
+    # NULL conditions are failures, while the aggregate of an empty table is NULL and the
+    # condition holds for it vacuously.
+    cond = table.select(ibis.coalesce(expr, False).name("cond"))["cond"]
+    return bool(ibis.coalesce(cond.all(), True).execute())
+
+
+def joined_max_abs_diff(
+    table: ibis.Table, expected: ibis.Table, key: str, col: str
+) -> tuple[int, float]:
+    """Join two results on `key` and return the number of joined rows and max |diff| of `col`."""
+    joined = table.join(expected.rename(expected=col), [key])
+    stats = joined.aggregate(
+        rows=ibis._.count(), diff=(ibis._[col] - ibis._.expected).abs().max()
+    ).to_pyarrow()
+    return stats.column("rows")[0].as_py(), stats.column("diff")[0].as_py()